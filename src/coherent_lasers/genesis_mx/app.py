@@ -15,6 +15,7 @@ Commands:
 import click
 import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from coherent_lasers.genesis_mx.driver import GenesisMX
 from coherent_lasers.genesis_mx.commands import OperationModes, ReadCmds
 from coherent_lasers.hops.lib import HOPSException, get_hops_manager
@@ -27,8 +28,10 @@ logger = logging.getLogger(__name__)
 @click.command()
 def cli() -> None:
     manager = get_hops_manager()
-    serials = manager._handles.values()
-    devices = {serial: GenesisMX(serial) for serial in serials}
+    serials = list(manager._handles.values())
+    # Each GenesisMX initializes its laser over several round-trips; do the lasers in parallel
+    with ThreadPoolExecutor() as pool:
+        devices = dict(zip(serials, pool.map(GenesisMX, serials)))
     click.echo(f"Found {len(serials)} devices:")
     if not devices:
         click.echo("No connected devices found.")
@@ -92,7 +95,7 @@ def validate_lasers(devices: dict[str, GenesisMX]) -> dict[str, GenesisMX]:
             click.echo(f"Error getting head type for device {serial}: {str(e)}")
             continue
         if response.strip() in head_types:
-            lasers[serial] = GenesisMX(serial)
+            lasers[serial] = device
     return lasers
 
 
@@ -109,26 +112,16 @@ def run_command_on_lasers(lasers: dict[str, GenesisMX], selected: list[str], com
 
 
 def handle_command(device: GenesisMX, command: str) -> None:
-    handlers = {
-        "send": send_command,
-        "enable": enable,
-        "disable": disable,
-        "info": info,
-        "mode": mode,
-        "power": power,
-        "status": status,
-        "help": display_help,
-    }
     parts: list[str] = command.split()
     if not parts:
         return
     cmd: str = parts[0].lower()
-    if cmd not in handlers:
+    if cmd not in HANDLERS:
         click.echo("Unknown command. Type 'help' for available commands.")
         return
     args = parts[1:]
     try:
-        handlers[cmd](device, args)
+        HANDLERS[cmd](device, args)
     except Exception as e:
         click.echo(f"Error executing command: {str(e)}")
 
@@ -193,10 +186,11 @@ def power(laser: GenesisMX, args=[]) -> None:
         click.echo("  Updating laser power...")
         if wait:
             time.sleep(1)
-    click.echo(f"    Power:             {laser.power_mw:.2f} mW")
-    click.echo(f"    Power Setpoint:    {laser.power_setpoint_mw:.2f} mW")
-    click.echo(f"    LDD Current:       {laser.ldd_current:.2f} A")
-    click.echo(f"    LDD Current Limit: {laser.ldd_current_limit:.2f} A")
+    metrics = laser.power_metrics
+    click.echo(f"    Power:             {metrics.power_mw:.2f} mW")
+    click.echo(f"    Power Setpoint:    {metrics.power_setpoint_mw:.2f} mW")
+    click.echo(f"    LDD Current:       {metrics.ldd_current:.2f} A")
+    click.echo(f"    LDD Current Limit: {metrics.ldd_current_limit:.2f} A")
 
 
 def status(laser: GenesisMX, args=None) -> None:
@@ -256,5 +250,17 @@ def display_help(laser: GenesisMX, args=None) -> None:
         click.echo(__doc__)
 
 
+HANDLERS = {
+    "send": send_command,
+    "enable": enable,
+    "disable": disable,
+    "info": info,
+    "mode": mode,
+    "power": power,
+    "status": status,
+    "help": display_help,
+}
+
+
 if __name__ == "__main__":
     cli(obj={})
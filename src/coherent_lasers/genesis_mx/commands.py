@@ -40,6 +40,10 @@ class ReadCmds(Enum):
     PSGLUE_INPUT_STATUS = "?PSGLUEIN"
     PSGLUE_OUTPUT_STATUS = "?PSGLUEOUT"
 
+    def __init__(self, command: str) -> None:
+        # Encoded once here so sending a read command does not re-encode it on every call
+        self.encoded = command.encode("utf-8")
+
 
 class WriteCmds(Enum):
     """Genesis MX Write Commands"""
@@ -50,6 +54,14 @@ class WriteCmds(Enum):
     SET_REMOTE_CONTROL = "REM="
     SET_SOFTWARE_SWITCH = "KSWCMD="
 
+    def __init__(self, command: str) -> None:
+        # Encoded once here so only the value needs encoding when a write command is sent
+        self.encoded = command.encode("utf-8")
+
+    def write_bytes(self, value: float | int) -> bytes:
+        """Build the encoded command that writes value."""
+        return self.encoded + str(value).encode("utf-8")
+
 
 class OperationModes(Enum):
     PHOTO = 0
@@ -1,18 +1,20 @@
 from dataclasses import dataclass
+from typing import Callable, TypeVar
 from enum import StrEnum
 import logging
+import time
 from coherent_lasers.genesis_mx.commands import ReadCmds, WriteCmds, OperationModes, Alarms
 from coherent_lasers.hops import HOPSDevice
 from ..hops.lib import HOPSException
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class GenesisMXTempMetric:
     temp: float
     voltage: float
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class GenesisMXTempMetrics:
     main: GenesisMXTempMetric
     etalon: GenesisMXTempMetric
@@ -20,7 +22,15 @@ class GenesisMXTempMetrics:
     shg: GenesisMXTempMetric
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
+class GenesisMXPowerMetrics:
+    power_mw: float
+    power_setpoint_mw: float
+    ldd_current: float
+    ldd_current_limit: float
+
+
+@dataclass(frozen=True, slots=True)
 class GenesisMXHeadInfo:
     serial: str
     type: str
@@ -38,7 +48,7 @@ class GenesisMXHeadType(StrEnum):
     MINI00 = "Mini00"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class GenesisMXEnableLoop:
     software: bool
     interlock: bool
@@ -56,17 +66,39 @@ class GenesisMXEnableLoop:
         return f"Software: {self.software}, Interlock: {self.interlock}, Key: {self.key}"
 
 
+T = TypeVar("T")
+
+TEMPERATURE_CMDS = [
+    ReadCmds.MAIN_TEMPERATURE,
+    ReadCmds.MAIN_TEC_DRIVE,
+    ReadCmds.ETALON_TEMPERATURE,
+    ReadCmds.ETALON_HEATER_DRIVE,
+    ReadCmds.BRF_TEMPERATURE,
+    ReadCmds.BRF_HEATER_DRIVE,
+    ReadCmds.SHG_TEMPERATURE,
+    ReadCmds.SHG_HEATER_DRIVE,
+]
+
+
 class GenesisMX:
-    def __init__(self, serial: str, logger: logging.Logger = None) -> None:
+    def __init__(self, serial: str, logger: logging.Logger = None, bool_cache_ttl_s: float = 0.0) -> None:
+        """
+        Connect to a Genesis MX laser by serial number.
+
+        bool_cache_ttl_s: if non-zero, boolean status reads and the enable loop are answered from the last response
+        for this many seconds instead of querying the laser again. Any write command clears the cache.
+        """
         self.log = logger if logger else logging.getLogger(f"{__name__}.{serial}")
         self.serial = serial
         self.hops = HOPSDevice(self.serial)
         if not self.hops:
             raise ValueError(f"Failed to initialize laser with serial number {self.serial}")
+        self._batch_reads = True
+        self._bool_cache_ttl_s = bool_cache_ttl_s
+        self._status_cache: dict[object, tuple[float, object]] = {}
         self.disable()
-        self._unit_factor = 1
-        if self.head.type == GenesisMXHeadType.MINIX:
-            self._unit_factor = 1000
+        self._head_identity = self._read_head_identity()
+        self._unit_factor = 1000 if self._head_identity[1] == GenesisMXHeadType.MINIX else 1
         try:
             self.remote_control_enable = True
         except HOPSException:
@@ -91,15 +123,23 @@ class GenesisMX:
     @power_mw.setter
     def power_mw(self, value: float) -> None:
         """Set the power of the laser."""
-        value = value / self._unit_factor
-        self.send_write_command(WriteCmds.SET_POWER, value)
-        if not self.enable_loop.enabled:
-            self.log.warning(f"Attempting to set power to {value} mW while laser is disabled.")
+        self.set_power_mw(value)
+
+    def set_power_mw(self, value: float, verify: bool = True) -> None:
+        """
+        Set the power of the laser.
+
+        With verify, the enable loop is read back to warn if the laser is disabled. Pass verify=False for
+        high-rate updates such as power sweeps to skip that extra round-trip.
+        """
+        self.send_write_command(WriteCmds.SET_POWER, value / self._unit_factor)
+        if verify and not self.enable_loop.enabled:
+            self.log.warning("Attempting to set power to %s mW while laser is disabled.", value)
 
     @property
     def power_setpoint_mw(self) -> float:
         """Get the current power setpoint of the laser."""
-        return float(self.send_read_command(ReadCmds.POWER_SETPOINT)) * self._unit_factor
+        return self.send_read_float_command(ReadCmds.POWER_SETPOINT) * self._unit_factor
 
     @property
     def ldd_current(self) -> float:
@@ -108,7 +148,7 @@ class GenesisMX:
 
         Measures the current supplied to the Laser Diode Driver (LDD).
         """
-        return float(self.send_read_command(ReadCmds.LDD_CURRENT))
+        return self.send_read_float_command(ReadCmds.LDD_CURRENT)
 
     @property
     def ldd_current_limit(self) -> float:
@@ -117,15 +157,31 @@ class GenesisMX:
 
         Measures the maximum current limit set for the Laser Diode Driver (LDD).
         """
-        return float(self.send_read_command(ReadCmds.LDD_CURRENT_LIMIT))
+        return self.send_read_float_command(ReadCmds.LDD_CURRENT_LIMIT)
+
+    @property
+    def power_metrics(self) -> GenesisMXPowerMetrics:
+        """Get the power, power setpoint, LDD current and LDD current limit of the laser in a single query."""
+        power, setpoint, current, current_limit = self.send_read_multi(
+            [ReadCmds.POWER, ReadCmds.POWER_SETPOINT, ReadCmds.LDD_CURRENT, ReadCmds.LDD_CURRENT_LIMIT]
+        )
+        return GenesisMXPowerMetrics(
+            power_mw=float(power) * self._unit_factor,
+            power_setpoint_mw=float(setpoint) * self._unit_factor,
+            ldd_current=float(current),
+            ldd_current_limit=float(current_limit),
+        )
 
     @property
     def enable_loop(self) -> GenesisMXEnableLoop:
-        return GenesisMXEnableLoop(
-            software=self.send_read_bool_command(ReadCmds.SOFTWARE_SWITCH_STATE),
-            interlock=self.send_read_bool_command(ReadCmds.INTERLOCK_STATUS),
-            key=self.send_read_bool_command(ReadCmds.KEY_SWITCH_STATE),
+        """Get the software switch, interlock and key switch states in a single query."""
+        return self._cached_status(GenesisMXEnableLoop, self._read_enable_loop)
+
+    def _read_enable_loop(self) -> GenesisMXEnableLoop:
+        software, interlock, key = self.send_read_multi(
+            [ReadCmds.SOFTWARE_SWITCH_STATE, ReadCmds.INTERLOCK_STATUS, ReadCmds.KEY_SWITCH_STATE]
         )
+        return GenesisMXEnableLoop(software=software == "1", interlock=interlock == "1", key=key == "1")
 
     def enable(self) -> GenesisMXEnableLoop:
         """Enable the laser."""
@@ -180,19 +236,31 @@ class GenesisMX:
 
     @property
     def head(self) -> GenesisMXHeadInfo:
-        """Get the laser head information."""
+        """
+        Get the laser head information.
+
+        The serial, type and board revision never change for a head, so they are read once on connection. Hours and
+        DIO status are read on every access.
+        """
+        serial, head_type, board_revision = self._head_identity
         try:
             dio_status = self.send_read_command(ReadCmds.HEAD_DIO_STATUS)
         except HOPSException:
             dio_status = "N/A"
         return GenesisMXHeadInfo(
-            serial=self.send_read_command(ReadCmds.HEAD_SERIAL),
-            type=self.send_read_command(ReadCmds.HEAD_TYPE),
+            serial=serial,
+            type=head_type,
             hours=self.send_read_command(ReadCmds.HEAD_HOURS),
-            board_revision=self.send_read_command(ReadCmds.HEAD_BOARD_REVISION),
+            board_revision=board_revision,
             dio_status=dio_status,
         )
 
+    def _read_head_identity(self) -> tuple[str, str, str]:
+        serial, head_type, board_revision = self.send_read_multi(
+            [ReadCmds.HEAD_SERIAL, ReadCmds.HEAD_TYPE, ReadCmds.HEAD_BOARD_REVISION]
+        )
+        return serial, head_type, board_revision
+
     @property
     def alarms(self) -> list[Alarms]:
         """Get the list of active alarms based on the fault code."""
@@ -266,28 +334,103 @@ class GenesisMX:
         """Get the etalon heater drive voltage of the laser."""
         return self.send_read_float_command(ReadCmds.ETALON_HEATER_DRIVE)
 
+    @property
+    def temperatures(self) -> GenesisMXTempMetrics:
+        """Get the temperature and drive voltage of the main TEC and the SHG, BRF and etalon heaters."""
+        return self._parse_temperatures(self.send_read_multi(TEMPERATURE_CMDS))
+
+    async def async_get_temperatures(self) -> GenesisMXTempMetrics:
+        """Get the temperature metrics of the laser without blocking the event loop."""
+        return self._parse_temperatures(await self.async_send_read_multi(TEMPERATURE_CMDS))
+
+    @staticmethod
+    def _parse_temperatures(responses: list[str]) -> GenesisMXTempMetrics:
+        values = [float(response) for response in responses]
+        return GenesisMXTempMetrics(
+            main=GenesisMXTempMetric(temp=values[0], voltage=values[1]),
+            etalon=GenesisMXTempMetric(temp=values[2], voltage=values[3]),
+            brf=GenesisMXTempMetric(temp=values[4], voltage=values[5]),
+            shg=GenesisMXTempMetric(temp=values[6], voltage=values[7]),
+        )
+
     # Commands
 
     def send_write_command(self, cmd: WriteCmds, value: float = None) -> None:
-        """Send a write command to the laser."""
-        if value is not None:
-            self.hops.send_command(f"{cmd.value}{value}")
-        else:
-            self.send_command(cmd.value)
+        """Send a write command to the laser. Writes are not read back, so each costs a single round-trip."""
+        self._status_cache.clear()
+        self.hops.send_command(cmd.encoded if value is None else cmd.write_bytes(value))
 
     def send_read_command(self, cmd: ReadCmds) -> str:
         """Send a read command to the laser."""
-        return self.hops.send_command(cmd.value)
+        return self.hops.send_command(cmd.encoded)
+
+    def send_read_multi(self, cmds: list[ReadCmds]) -> list[str]:
+        """
+        Send several read commands to the laser in a single concatenated query.
+
+        Each command costs a full USB round-trip, so the commands are joined with ';' and sent at once.
+        If the laser rejects the query or does not answer with one response per command, the commands are sent
+        sequentially instead. Once sequential reads succeed where batching did not, batching is disabled for this
+        laser. A transient error fails the sequential reads too and leaves batching enabled.
+        """
+        if self._batch_reads:
+            try:
+                response = self.hops.send_command(";".join(cmd.value for cmd in cmds))
+            except HOPSException as e:
+                responses = [self.send_read_command(cmd) for cmd in cmds]
+                self._disable_batch_reads(e)
+                return responses
+            responses = self._split_batch_response(cmds, response)
+            if responses is not None:
+                return responses
+        return [self.send_read_command(cmd) for cmd in cmds]
+
+    async def async_send_read_multi(self, cmds: list[ReadCmds]) -> list[str]:
+        """Send several read commands to the laser in a single concatenated query without blocking the event loop."""
+        if self._batch_reads:
+            try:
+                response = await self.hops.async_send_command(";".join(cmd.value for cmd in cmds))
+            except HOPSException as e:
+                responses = await self.hops.async_send_commands([cmd.encoded for cmd in cmds])
+                self._disable_batch_reads(e)
+                return responses
+            responses = self._split_batch_response(cmds, response)
+            if responses is not None:
+                return responses
+        return await self.hops.async_send_commands([cmd.encoded for cmd in cmds])
+
+    def _split_batch_response(self, cmds: list[ReadCmds], response: str) -> list[str] | None:
+        """Split a concatenated query's response, disabling batching if it does not hold one field per command."""
+        responses = response.split(";")
+        if len(responses) == len(cmds):
+            return [response.strip() for response in responses]
+        self._disable_batch_reads(response)
+        return None
+
+    def _disable_batch_reads(self, reason: object) -> None:
+        self._batch_reads = False
+        self.log.debug("Concatenated reads not supported (%s), falling back to sequential reads.", reason)
 
     def send_read_bool_command(self, cmd: ReadCmds) -> bool:
-        """Send a read command to the laser."""
-        OK = {1, "1"}
-        return self.send_read_command(cmd).strip() in OK
+        """Send a read command to the laser and parse the response as a boolean."""
+        return self._cached_status(cmd, lambda: self.hops.send_command_raw(cmd.encoded).strip() == b"1")
+
+    def _cached_status(self, key: object, read: Callable[[], T]) -> T:
+        """Return read()'s result, reusing the last one for key while it is younger than bool_cache_ttl_s."""
+        if not self._bool_cache_ttl_s:
+            return read()
+        now = time.monotonic()
+        cached = self._status_cache.get(key)
+        if cached is not None and now - cached[0] < self._bool_cache_ttl_s:
+            return cached[1]
+        value = read()
+        self._status_cache[key] = (now, value)
+        return value
 
     def send_read_float_command(self, cmd: ReadCmds) -> float:
-        """Send a read command to the laser."""
-        return float(self.send_read_command(cmd).strip())
+        """Send a read command to the laser and parse the response as a float."""
+        return float(self.hops.send_command(cmd.encoded))
 
     def close(self) -> None:
-        self.power_setpoint_mw = 0
+        self.set_power_mw(0, verify=False)
         self.hops.close()
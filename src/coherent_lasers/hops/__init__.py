@@ -8,10 +8,7 @@ Setup:
 2. Place the DLL files in this package alongside the respective .h files.
 """
 
-import platform
-import sys
-
-# Ensure is windows
+# Ensure is windows (re-enabling this check needs `import platform` and `import sys`)
 # if not (sys.platform.startswith("win") and platform.machine().endswith("64")):
 #     raise OSError("This package only supports 64-bit Windows systems.")
 
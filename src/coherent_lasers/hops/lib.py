@@ -1,11 +1,13 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import ctypes as C
 from ctypes.util import find_library
 import logging
 import os
 import threading
+from typing import Iterable
 
 # Setup logging
-logging.basicConfig(level=logging.ERROR)
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.ERROR)
 
@@ -17,27 +19,26 @@ DLL_DIR = os.path.dirname(os.path.abspath(__file__))
 # Add the DLL directory to the system PATH
 os.environ["PATH"] = DLL_DIR + os.pathsep + os.environ["PATH"]
 
-# Check for required DLLs using ctypes.util.find_library
+# Check for required DLLs using ctypes.util.find_library, resolving each path once
 REQUIRED_DLLS = ["CohrHOPS", "CohrFTCI2C"]
-for dll_name in REQUIRED_DLLS:
-    dll_path = find_library(dll_name)
+DLL_PATHS = {dll_name: find_library(dll_name) for dll_name in REQUIRED_DLLS}
+for dll_name, dll_path in DLL_PATHS.items():
     if dll_path is None:
         raise FileNotFoundError(f"Required 64-bit DLL file not found: {dll_name}.dll")
 
-# Try to load the DLLs to ensure they're accessible
+# Load the DLLs once to ensure they're accessible; the manager reuses these handles
 try:
-    C.CDLL(find_library("CohrHOPS"))
-    C.CDLL(find_library("CohrFTCI2C"))
+    DLLS = {dll_name: C.CDLL(dll_path) for dll_name, dll_path in DLL_PATHS.items()}
 except Exception as e:
-    logger.error(f"Error loading 64-bit DLLs: {e}")
+    logger.error("Error loading 64-bit DLLs: %s", e)
     raise
 
 
 # Constants
-HOPS_DLL = os.path.join(DLL_DIR, "CohrHOPS.dll")
 MAX_DEVICES = 20
 MAX_STRLEN = 100
 COHRHOPS_OK = 0
+SERIAL_QUERY = b"?HID"
 
 # C types
 LPULPTR = C.POINTER(C.c_ulonglong)
@@ -56,160 +57,259 @@ class HOPSException(Exception):
 class HOPSDevicesList:
     def __init__(self):
         self.devices = (COHRHOPS_HANDLE * MAX_DEVICES)()
+        self.count = C.c_ulong()
 
     def __getitem__(self, index):
         return self.devices[index]
 
+    def __len__(self) -> int:
+        return self.count.value
+
+    @property
+    def handles(self) -> list[int]:
+        """The populated handles, copied out of the ctypes array in a single slice."""
+        return self.devices[: self.count.value]
+
     def pointer(self):
         return self.devices
 
 
 class HOPSManager:
     def __init__(self):
-        self._log = logging.getLogger(__name__)
+        self._log = logger
 
-        self._handles: dict[COHRHOPS_HANDLE, str] = {}
+        self._handles: dict[COHRHOPS_HANDLE, str] = {}  # open handles of active devices
+        self._known_serials: dict[COHRHOPS_HANDLE, str] = {}  # every connected handle whose serial was queried
+        self._serials: dict[str, COHRHOPS_HANDLE] = {}
+        self._handle_locks: dict[COHRHOPS_HANDLE, threading.Lock] = {}
+        self._executors: dict[str, ThreadPoolExecutor] = {}
         self._active_serials: set[str] = set()
+        self._buffers = threading.local()
+        self._lock = threading.Lock()  # guards the handle tables; DLL traffic uses the per-handle locks
 
-        self._dll = C.CDLL(HOPS_DLL)
+        self._dll = DLLS["CohrHOPS"]
         self._wrap_functions()
+        self.version = self._read_dll_version()
 
         self._devices_connected = HOPSDevicesList()
-        self._number_of_devices_connected = C.c_ulong()
         self._devices_added = HOPSDevicesList()
-        self._number_of_devices_added = C.c_ulong()
         self._devices_removed = HOPSDevicesList()
-        self._number_of_devices_removed = C.c_ulong()
 
         self._fetch_device_connection_info()
         self._activate_all_devices()
 
     def initialize_device(self, serial: str) -> COHRHOPS_HANDLE:
-        self._active_serials.add(serial)
-        self._refresh_devices()
-        return next(handle for handle, ser in self._handles.items() if ser == serial)
+        with self._lock:
+            self._active_serials.add(serial)
+            self._refresh_devices()
+            return self._get_handle(serial)
 
     def close_device(self, serial: str) -> None:
-        self._active_serials.remove(serial)
-        self._refresh_devices()
-
-    def send_device_command(self, serial: str, command: str) -> str:
-        handle = next(handle for handle, ser in self._handles.items() if ser == serial)
-        response: str = C.create_string_buffer(MAX_STRLEN)
-        res = self._send_command(handle, command.encode(), response)
+        with self._lock:
+            self._active_serials.remove(serial)
+            self._refresh_devices()
+            executor = self._executors.pop(serial, None)
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def device_executor(self, serial: str) -> ThreadPoolExecutor:
+        """
+        Return the dedicated worker thread that runs a device's async commands in submission order.
+
+        Raises HOPSException if the device is not connected or has been closed, so no worker is started that
+        close_device would never shut down.
+        """
+        executor = self._executors.get(serial)
+        if executor is None:
+            with self._lock:
+                self._get_handle(serial)
+                executor = self._executors.get(serial)
+                if executor is None:
+                    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"hops-{serial}")
+                    self._executors[serial] = executor
+        return executor
+
+    def send_device_command(self, serial: str, command: str | bytes) -> str:
+        return self.send_device_command_raw(serial, command).decode("utf-8").strip()
+
+    def send_device_commands(self, serial: str, commands: list[str | bytes]) -> list[str]:
+        """Send several commands to a device back to back."""
+        return [self.send_device_command(serial, command) for command in commands]
+
+    def send_device_command_raw(self, serial: str, command: str | bytes) -> bytes:
+        """Send a command and return the undecoded response bytes."""
+        handle = self._get_handle(serial)
+        response = self._response_buffer()
+        with self._handle_locks[handle]:
+            res = self._send_command(handle, self._command_buffer(command), response)
         if res != COHRHOPS_OK:
             raise HOPSException(f"Error sending command to device {serial}", res)
-        return response.value.decode("utf-8").strip()
-
-    @property
-    def version(self) -> str:
-        buffer = C.create_string_buffer(MAX_STRLEN)
-        res = self._get_dll_version(buffer)
-        if res == COHRHOPS_OK:
-            return buffer.value.decode("utf-8")
-        else:
-            raise Exception(f"Error getting DLL version: {res}")
+        return response.value
 
     # def __del__(self) -> None:
     #     self._fetch_device_connection_info()
-    #     for i in range(self._number_of_devices_connected.value):
-    #         handle = self._devices_connected[i]
+    #     for handle in self._devices_connected.handles:
     #         self._close(handle)
 
     def _wrap_functions(self):
+        # Functions loaded through CDLL release the GIL for the duration of each call, so commands to
+        # different devices running on their worker threads do overlap.
         self._initialize_handle = self._dll.CohrHOPS_InitializeHandle
         self._initialize_handle.argtypes = [COHRHOPS_HANDLE, LPSTR]
-        self._initialize_handle.restype = int
+        self._initialize_handle.restype = C.c_int
 
         self._send_command = self._dll.CohrHOPS_SendCommand
         self._send_command.argtypes = [COHRHOPS_HANDLE, LPSTR, LPSTR]
-        self._send_command.restype = int
+        self._send_command.restype = C.c_int
 
         self._close = self._dll.CohrHOPS_Close
         self._close.argtypes = [COHRHOPS_HANDLE]
-        self._close.restype = int
+        self._close.restype = C.c_int
 
         self._get_dll_version = self._dll.CohrHOPS_GetDLLVersion
         self._get_dll_version.argtypes = [LPSTR]
-        self._get_dll_version.restype = int
+        self._get_dll_version.restype = C.c_int
 
         self._check_for_devices = self._dll.CohrHOPS_CheckForDevices
         self._check_for_devices.argtypes = [LPULPTR, LPDWORD, LPULPTR, LPDWORD, LPULPTR, LPDWORD]
-        self._check_for_devices.restype = int
+        self._check_for_devices.restype = C.c_int
+
+    def _index_handles(self) -> None:
+        self._serials = {ser: handle for handle, ser in self._handles.items()}
+
+    def _handle_lock(self, handle: COHRHOPS_HANDLE) -> threading.Lock:
+        """Return the lock serializing DLL calls on handle, creating it on first use. Call under self._lock."""
+        lock = self._handle_locks.get(handle)
+        if lock is None:
+            lock = self._handle_locks[handle] = threading.Lock()
+        return lock
+
+    def _get_handle(self, serial: str) -> COHRHOPS_HANDLE:
+        try:
+            return self._serials[serial]
+        except KeyError:
+            raise HOPSException(f"Device {serial} is not connected or has been closed") from None
+
+    def _read_dll_version(self) -> str:
+        buffer = self._response_buffer()
+        res = self._get_dll_version(buffer)
+        if res != COHRHOPS_OK:
+            raise HOPSException("Error getting DLL version", res)
+        return buffer.value.decode("utf-8")
+
+    def _response_buffer(self) -> C.Array:
+        """Return this thread's reusable response buffer, cleared for the next DLL call."""
+        buffer = getattr(self._buffers, "response", None)
+        if buffer is None:
+            buffer = self._buffers.response = C.create_string_buffer(MAX_STRLEN)
+        buffer[0] = b"\0"
+        return buffer
+
+    def _command_buffer(self, command: str | bytes) -> C.Array:
+        """
+        Return this thread's reusable command buffer holding command.
+
+        The DLL takes the command as a non-const LPSTR and parses it, so it is given this writable copy rather than
+        a pointer into a shared, immutable bytes object.
+        """
+        buffer = getattr(self._buffers, "command", None)
+        if buffer is None:
+            buffer = self._buffers.command = C.create_string_buffer(MAX_STRLEN + 1)
+        buffer.value = command.encode("utf-8") if isinstance(command, str) else command
+        return buffer
 
     def _fetch_device_connection_info(self):
         self._log.debug("Updating devices info...")
         res = self._check_for_devices(
             self._devices_connected.pointer(),
-            C.byref(self._number_of_devices_connected),
+            C.byref(self._devices_connected.count),
             self._devices_added.pointer(),
-            C.byref(self._number_of_devices_added),
+            C.byref(self._devices_added.count),
             self._devices_removed.pointer(),
-            C.byref(self._number_of_devices_removed),
+            C.byref(self._devices_removed.count),
         )
         if res != COHRHOPS_OK:
             raise HOPSException(f"Error checking for devices: {res}")
-        self._log.debug(f"Updated devices info. Connected: {self._number_of_devices_connected.value}")
+        self._log.debug("Updated devices info. Connected: %d", len(self._devices_connected))
 
     def _activate_all_devices(self):
         self._log.debug("Activating all devices...")
-        connected_handles = {self._devices_connected[i] for i in range(self._number_of_devices_connected.value)}
-        for handle in connected_handles:
-            self._initialize_device_by_handle(handle)
-            ser = self._get_device_serial(handle)
-            self._handles[handle] = ser
-            self._active_serials.add(ser)
-        self._log.debug("Registered Handles: " + str(self._handles))
-        self._log.debug("Active Devices: " + str(self._active_serials))
+        self._handles.update(self._open_and_identify(self._devices_connected.handles))
+        self._active_serials.update(self._handles.values())
+        self._index_handles()
+        self._log.debug("Registered Handles: %s", self._handles)
+        self._log.debug("Active Devices: %s", self._active_serials)
 
     def _validate_active_devices(self):
         self._log.debug("Validating active devices...")
-        connected_handles = {self._devices_connected[i] for i in range(self._number_of_devices_connected.value)}
-        for handle in connected_handles:
-            self._initialize_device_by_handle(handle)
-            ser = self._get_device_serial(handle)
-            self._handles[handle] = ser
-            if ser not in self._active_serials:
+        # Only handles that were added since the last check need their serial queried. Known handles are opened or
+        # closed only when their device's active state changed. A handle that was removed, or removed and added
+        # again, may now belong to a different device, so its cached serial and open state are discarded.
+        stale = set(self._devices_removed.handles) | set(self._devices_added.handles)
+        current = set(self._devices_connected.handles) - stale
+        self._known_serials = {handle: ser for handle, ser in self._known_serials.items() if handle in current}
+        handles = {handle: ser for handle, ser in self._handles.items() if handle in current}
+        connected = set(self._devices_connected.handles)
+        handles.update(self._open_and_identify(connected - self._known_serials.keys()))
+        for handle, ser in self._known_serials.items():
+            active = ser in self._active_serials
+            if active and handle not in handles:
+                with self._handle_lock(handle):
+                    self._initialize_device_by_handle(handle)
+                handles[handle] = ser
+            elif not active and handle in handles:
                 self._close_device_by_handle(handle)
-        self._handles = {handle: ser for handle, ser in self._handles.items() if ser in self._active_serials}
-        self._log.debug("Registered Handles: " + str(self._handles))
-        self._log.debug("Active Devices: " + str(self._active_serials))
+                del handles[handle]
+        self._handles = handles
+        self._index_handles()
+        self._log.debug("Registered Handles: %s", self._handles)
+        self._log.debug("Active Devices: %s", self._active_serials)
 
     def _refresh_devices(self):
         self._fetch_device_connection_info()
         self._validate_active_devices()
 
+    def _open_and_identify(self, handles: Iterable[COHRHOPS_HANDLE]) -> dict[COHRHOPS_HANDLE, str]:
+        """Initialize each handle and map it to its device's serial number, remembering it for later refreshes."""
+        serials = {}
+        for handle in handles:
+            with self._handle_lock(handle):
+                self._initialize_device_by_handle(handle)
+                serials[handle] = self._get_device_serial(handle)
+        self._known_serials.update(serials)
+        return serials
+
     def _get_device_serial(self, handle: COHRHOPS_HANDLE) -> str:
-        response = C.create_string_buffer(MAX_STRLEN)
-        res = self._send_command(handle, "?HID".encode("utf-8"), response)
+        response = self._response_buffer()
+        res = self._send_command(handle, self._command_buffer(SERIAL_QUERY), response)
         if res != COHRHOPS_OK:
             raise HOPSException(f"Error getting serial number for handle {handle}")
         return response.value.decode("utf-8").strip()
 
     def _initialize_device_by_handle(self, handle: COHRHOPS_HANDLE) -> None:
         """Given a handle, initialize the device and return the serial number."""
-        headtype = C.create_string_buffer(MAX_STRLEN)
+        headtype = self._response_buffer()
         res = self._initialize_handle(handle, headtype)
         if res != COHRHOPS_OK:
             raise HOPSException("Error initializing device")
 
     def _close_device_by_handle(self, handle: COHRHOPS_HANDLE) -> None:
         """Close the device associated with the given handle."""
-        res = self._close(handle)
+        with self._handle_lock(handle):
+            res = self._close(handle)
         if res != COHRHOPS_OK:
             raise HOPSException(f"Error closing device with handle {handle}")
 
 
-_hops_manager_instance = None
-_hops_manager_lock = threading.Lock()
+# Created on first call, which happens while this module is imported (see HOPSDevice._manager), so the
+# import lock already guarantees a single instance.
+_hops_manager_instance: HOPSManager | None = None
 
 
-def get_hops_manager():
+def get_hops_manager() -> HOPSManager:
     global _hops_manager_instance
     if _hops_manager_instance is None:
-        with _hops_manager_lock:
-            if _hops_manager_instance is None:
-                _hops_manager_instance = HOPSManager()
+        _hops_manager_instance = HOPSManager()
     return _hops_manager_instance
 
 
@@ -219,8 +319,20 @@ class HOPSDevice:
     def __init__(self, serial: str):
         self.serial = serial
 
-    def send_command(self, command: str) -> str:
+    def send_command(self, command: str | bytes) -> str:
         return self._manager.send_device_command(self.serial, command)
 
+    def send_command_raw(self, command: str | bytes) -> bytes:
+        return self._manager.send_device_command_raw(self.serial, command)
+
+    async def async_send_command(self, command: str | bytes) -> str:
+        """Send a command from the device's worker thread so the event loop is not blocked by the DLL call."""
+        return await asyncio.wrap_future(self._manager.device_executor(self.serial).submit(self.send_command, command))
+
+    async def async_send_commands(self, commands: list[str | bytes]) -> list[str]:
+        """Send several commands in a single worker thread dispatch rather than one per command."""
+        executor = self._manager.device_executor(self.serial)
+        return await asyncio.wrap_future(executor.submit(self._manager.send_device_commands, self.serial, commands))
+
     def close(self):
         self._manager.close_device(self.serial)
@@ -0,0 +1,83 @@
+"""Shared fixtures: a fake CohrHOPS DLL so the library can be exercised without hardware."""
+
+import ctypes
+import ctypes.util
+import sys
+
+import pytest
+
+
+class FakeHOPSDLL:
+    """Stands in for CohrHOPS.dll, recording every call and answering commands from a table."""
+
+    def __init__(self) -> None:
+        self.devices: dict[int, str] = {}  # connected handle -> serial
+        self.responses: dict[str, str] = {}  # command -> response, overriding the defaults
+        self.failing: set[str] = set()  # commands answered with an error code
+        self.batch = True  # whether ';'-joined queries are answered field by field
+        self.calls: list[tuple] = []
+        self._reported: dict[int, str] = {}  # devices as of the last CheckForDevices call
+
+        self.CohrHOPS_InitializeHandle = lambda handle, headtype: self._record(("InitializeHandle", handle))
+        self.CohrHOPS_Close = lambda handle: self._record(("Close", handle))
+        self.CohrHOPS_SendCommand = lambda handle, command, response: self._send(handle, command, response)
+        self.CohrHOPS_GetDLLVersion = lambda buffer: self._version(buffer)
+        self.CohrHOPS_CheckForDevices = lambda *args: self._check_for_devices(*args)
+
+    def commands(self) -> list[tuple[int, str]]:
+        """The (handle, command) pairs sent so far."""
+        return [(call[1], call[2]) for call in self.calls if call[0] == "SendCommand"]
+
+    def _record(self, call: tuple) -> int:
+        self.calls.append(call)
+        return 0
+
+    def _respond(self, handle: int, command: str) -> str:
+        if command in self.responses:
+            return self.responses[command]
+        if ";" in command:
+            return ";".join(self._respond(handle, cmd) for cmd in command.split(";")) if self.batch else "ERR"
+        if command == "?HID":
+            return self.devices[handle]
+        return "" if "=" in command else "0"
+
+    def _send(self, handle, command, response) -> int:
+        command = command.value.decode("utf-8")
+        self._record(("SendCommand", handle, command))
+        if command in self.failing:
+            return 1
+        response.value = self._respond(handle, command).encode("utf-8")
+        return 0
+
+    def _version(self, buffer) -> int:
+        buffer.value = b"1.0.0"
+        return 0
+
+    def _check_for_devices(self, connected, connected_count, added, added_count, removed, removed_count) -> int:
+        self.calls.append(("CheckForDevices",))
+        # Like the DLL, report changes since the previous check: a handle now held by another device is both
+        # removed and added.
+        new = [handle for handle, ser in self.devices.items() if self._reported.get(handle) != ser]
+        gone = [handle for handle, ser in self._reported.items() if self.devices.get(handle) != ser]
+        for array, count, handles in (
+            (connected, connected_count, list(self.devices)),
+            (added, added_count, new),
+            (removed, removed_count, gone),
+        ):
+            for i, handle in enumerate(handles):
+                array[i] = handle
+            count._obj.value = len(handles)
+        self._reported = dict(self.devices)
+        return 0
+
+
+@pytest.fixture
+def fake_dll(monkeypatch) -> FakeHOPSDLL:
+    """Patch DLL loading so coherent_lasers modules imported by the test are backed by a fresh FakeHOPSDLL."""
+    dll = FakeHOPSDLL()
+    dll.devices = {11: "A1", 22: "B2"}
+    monkeypatch.setattr(ctypes.util, "find_library", lambda name: name)
+    monkeypatch.setattr(ctypes, "CDLL", lambda path: dll)
+    for name in [name for name in sys.modules if name.startswith("coherent_lasers")]:
+        monkeypatch.delitem(sys.modules, name)
+    return dll
@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+
+ENABLE_LOOP_QUERY = "?KSWCMD;?INT;?KSW"
+
+
+@pytest.fixture
+def laser(fake_dll):
+    from coherent_lasers.genesis_mx.driver import GenesisMX
+
+    fake_dll.responses.update({"?HTYPE": "MiniX", "?P": "0.5", "?KSWCMD": "1", "?INT": "1", "?KSW": "1"})
+    laser = GenesisMX("A1")
+    fake_dll.calls.clear()
+    return laser
+
+
+def test_batched_read_is_a_single_query(laser, fake_dll):
+    assert laser.enable_loop.enabled
+    assert fake_dll.commands() == [(11, ENABLE_LOOP_QUERY)]
+
+
+def test_rejected_batch_switches_to_sequential_reads(laser, fake_dll):
+    fake_dll.batch = False
+    assert laser.enable_loop.enabled
+    assert fake_dll.commands() == [(11, ENABLE_LOOP_QUERY), (11, "?KSWCMD"), (11, "?INT"), (11, "?KSW")]
+
+    fake_dll.calls.clear()
+    assert laser.enable_loop.enabled
+    assert fake_dll.commands() == [(11, "?KSWCMD"), (11, "?INT"), (11, "?KSW")]
+
+
+def test_failed_batch_switches_to_sequential_reads(laser, fake_dll):
+    fake_dll.failing.add(ENABLE_LOOP_QUERY)
+    assert laser.enable_loop.enabled
+    assert fake_dll.commands() == [(11, ENABLE_LOOP_QUERY), (11, "?KSWCMD"), (11, "?INT"), (11, "?KSW")]
+
+    fake_dll.calls.clear()
+    assert laser.enable_loop.enabled
+    assert fake_dll.commands() == [(11, "?KSWCMD"), (11, "?INT"), (11, "?KSW")]
+
+
+def test_transient_error_keeps_batching(laser, fake_dll):
+    from coherent_lasers.hops.lib import HOPSException
+
+    fake_dll.failing.update({ENABLE_LOOP_QUERY, "?KSWCMD"})
+    with pytest.raises(HOPSException):
+        laser.enable_loop
+
+    fake_dll.failing.clear()
+    fake_dll.calls.clear()
+    assert laser.enable_loop.enabled
+    assert fake_dll.commands() == [(11, ENABLE_LOOP_QUERY)]
+
+
+def test_head_identity_is_read_once(fake_dll):
+    from coherent_lasers.genesis_mx.driver import GenesisMX
+
+    fake_dll.responses.update({"?HTYPE": "MiniX", "?P": "0.5"})
+    laser = GenesisMX("A1")
+    assert [cmd for _, cmd in fake_dll.commands()].count("?HID;?HTYPE;?HBDREV") == 1
+    assert laser.power_mw == 500
+
+    fake_dll.calls.clear()
+    assert laser.head.type == "MiniX"
+    assert fake_dll.commands() == [(11, "?HEADDIO"), (11, "?HH")]
+
+
+def test_status_cache_covers_enable_loop_until_a_write(fake_dll):
+    from coherent_lasers.genesis_mx.driver import GenesisMX
+
+    laser = GenesisMX("A1", bool_cache_ttl_s=60)
+    fake_dll.calls.clear()
+    laser.enable_loop
+    laser.enable_loop
+    assert fake_dll.commands() == [(11, ENABLE_LOOP_QUERY)]
+
+    fake_dll.calls.clear()
+    laser.enable()
+    assert fake_dll.commands() == [(11, "KSWCMD=1"), (11, ENABLE_LOOP_QUERY)]
+
+
+def test_power_metrics_is_a_single_query_in_mw(laser, fake_dll):
+    fake_dll.responses.update({"?PCMD": "0.4", "?C": "30", "?CLIM": "40"})
+    metrics = laser.power_metrics
+    assert (metrics.power_mw, metrics.power_setpoint_mw) == (500, 400)
+    assert (metrics.ldd_current, metrics.ldd_current_limit) == (30, 40)
+    assert fake_dll.commands() == [(11, "?P;?PCMD;?C;?CLIM")]
+
+
+def test_async_fallback_is_a_single_dispatch(laser, fake_dll, monkeypatch):
+    from coherent_lasers.genesis_mx.driver import TEMPERATURE_CMDS
+
+    dispatches = []
+    send_commands = laser.hops.async_send_commands
+
+    async def recording_send_commands(commands):
+        dispatches.append(commands)
+        return await send_commands(commands)
+
+    monkeypatch.setattr(laser.hops, "async_send_commands", recording_send_commands)
+    fake_dll.batch = False
+    temperatures = asyncio.run(laser.async_get_temperatures())
+    assert temperatures.main.temp == 0
+    assert len(dispatches) == 1
+    assert [cmd for _, cmd in fake_dll.commands()[1:]] == [cmd.value for cmd in TEMPERATURE_CMDS]
+
+
+def test_close_zeroes_power_without_reading_back(laser, fake_dll):
+    laser.close()
+    assert fake_dll.commands() == [(11, "PCMD=0.0")]
+    assert ("Close", 11) in fake_dll.calls
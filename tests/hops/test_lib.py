@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+
+
+@pytest.fixture
+def manager(fake_dll):
+    from coherent_lasers.hops.lib import get_hops_manager
+
+    manager = get_hops_manager()
+    fake_dll.calls.clear()
+    return manager
+
+
+def test_startup_opens_and_identifies_every_device(fake_dll):
+    from coherent_lasers.hops.lib import get_hops_manager
+
+    manager = get_hops_manager()
+    assert manager._handles == {11: "A1", 22: "B2"}
+    assert manager._active_serials == {"A1", "B2"}
+    assert fake_dll.calls == [
+        ("CheckForDevices",),
+        ("InitializeHandle", 11),
+        ("SendCommand", 11, "?HID"),
+        ("InitializeHandle", 22),
+        ("SendCommand", 22, "?HID"),
+    ]
+
+
+def test_close_closes_only_that_device(manager, fake_dll):
+    manager.close_device("A1")
+    assert fake_dll.calls == [("CheckForDevices",), ("Close", 11)]
+    assert manager._handles == {22: "B2"}
+
+
+def test_reopen_only_initializes_the_handle(manager, fake_dll):
+    manager.close_device("A1")
+    fake_dll.calls.clear()
+    assert manager.initialize_device("A1") == 11
+    assert fake_dll.calls == [("CheckForDevices",), ("InitializeHandle", 11)]
+    assert manager._handles == {11: "A1", 22: "B2"}
+
+
+def test_new_inactive_handle_is_identified_then_closed(manager, fake_dll):
+    fake_dll.devices[33] = "C3"
+    manager.initialize_device("A1")
+    assert fake_dll.calls == [
+        ("CheckForDevices",),
+        ("InitializeHandle", 33),
+        ("SendCommand", 33, "?HID"),
+        ("Close", 33),
+    ]
+    assert manager._handles == {11: "A1", 22: "B2"}
+
+    fake_dll.calls.clear()
+    assert manager.initialize_device("C3") == 33
+    assert fake_dll.calls == [("CheckForDevices",), ("InitializeHandle", 33)]
+
+
+def test_disconnected_device_is_dropped(manager, fake_dll):
+    from coherent_lasers.hops.lib import HOPSException
+
+    del fake_dll.devices[11]
+    manager.initialize_device("B2")
+    assert fake_dll.calls == [("CheckForDevices",)]
+    assert manager._handles == {22: "B2"}
+    with pytest.raises(HOPSException):
+        manager.send_device_command("A1", "?P")
+
+
+def test_send_command_failure_raises(manager, fake_dll):
+    from coherent_lasers.hops.lib import HOPSException
+
+    fake_dll.failing.add("?P")
+    with pytest.raises(HOPSException):
+        manager.send_device_command("A1", "?P")
+
+
+def test_closed_device_does_not_start_a_worker(manager, fake_dll):
+    from coherent_lasers.hops.lib import HOPSDevice, HOPSException
+
+    device = HOPSDevice("A1")
+    assert asyncio.run(device.async_send_command("?P")) == "0"
+    device.close()
+    with pytest.raises(HOPSException):
+        asyncio.run(device.async_send_command("?P"))
+    assert manager._executors == {}
+
+
+def test_handle_taken_over_by_another_device_is_reidentified(manager, fake_dll):
+    from coherent_lasers.hops.lib import HOPSException
+
+    fake_dll.devices[11] = "Z9"
+    manager.initialize_device("B2")
+    assert fake_dll.calls == [
+        ("CheckForDevices",),
+        ("InitializeHandle", 11),
+        ("SendCommand", 11, "?HID"),
+        ("Close", 11),
+    ]
+    assert manager._handles == {22: "B2"}
+    with pytest.raises(HOPSException):
+        manager.send_device_command("A1", "?HID")